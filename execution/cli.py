@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+
+from scraper import SOURCES, fetch_page, parse_articles, run_source_crawl
+from text_cleaner import DEFAULT_SUMMARY_TOKEN_BUDGET, estimate_tokens, normalize_title, prepare_for_translation
+
+# Layer 3: Deterministic Execution
+# 크롤러 CLI: crawl / fetch / parse / translate / replay / bench
+# - supabase, google.generativeai, bs4, requests는 해당 단계에서만 import
+#   → fetch/parse/dry-run 같은 짧은 작업은 SDK 로딩 없이 바로 실행
+# - --dry-run / --no-translate는 워크플로 입력(dryRun / translate)과 대응
+#
+# 예시:
+#   python execution/cli.py crawl --source techcrunch-startups --max-items 5 --no-translate
+#   python execution/cli.py fetch --source sifted
+#   python execution/cli.py parse --source sifted --input .tmp/seeds/sifted.xml
+#   python execution/cli.py replay --source sifted --input .tmp/seeds/sifted.xml --dry-run
+#   python execution/cli.py bench --source sifted --input .tmp/seeds/sifted.xml
+
+SEED_DIR = os.path.join('.tmp', 'seeds')
+HEAVY_MODULES = ('requests', 'bs4', 'supabase', 'google.generativeai')
+
+
+def select_sources(slugs):
+    """--source 슬러그로 SOURCES 필터링 (미지정 시 전체)"""
+    if not slugs:
+        return list(SOURCES)
+    by_slug = {config['slug']: (config, limit) for config, limit in SOURCES}
+    unknown = [slug for slug in slugs if slug not in by_slug]
+    if unknown:
+        raise SystemExit(f"Unknown source: {', '.join(unknown)} (available: {', '.join(by_slug)})")
+    return [by_slug[slug] for slug in slugs]
+
+
+def seed_url(config):
+    return config.get('seed_url') or config['base_url']
+
+
+def read_input(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def load_seed(config, path=None):
+    """--input 파일이 있으면 읽고, 없으면 seed URL fetch"""
+    return read_input(path) if path else fetch_page(seed_url(config))
+
+
+def resolve_max_items(args, limit):
+    """--max-items가 지정되면 (0 포함) 소스 기본 한도 대신 사용"""
+    return args.max_items if args.max_items is not None else limit
+
+
+def preview_articles(config, content, max_items):
+    """dry-run: 저장/번역 없이 파싱 + 번역 입력 정규화 결과만 생성 (실제 런과 같은 토큰 예산)"""
+    token_budget = config['crawl_policy'].get('summary_token_budget', DEFAULT_SUMMARY_TOKEN_BUDGET)
+    preview = []
+    for article in parse_articles(config, content)[:max_items]:
+        summary_src = prepare_for_translation(article.get('excerpt'), max_tokens=token_budget)
+        preview.append({
+            'title': normalize_title(article['title']),
+            'url': article['url'],
+            'published_date': article.get('published_date'),
+            'summary_src': summary_src,
+            'summary_tokens': estimate_tokens(summary_src),
+        })
+    return preview
+
+
+def print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+# ── Subcommands ──────────────────────────────────────────────
+
+def cmd_crawl(args):
+    affected_days = set()
+    for config, limit in select_sources(args.source):
+        max_items = resolve_max_items(args, limit)
+        try:
+            if args.dry_run:
+                content = load_seed(config)
+                if not content:
+                    print(f"Failed to fetch {config['slug']}", file=sys.stderr)
+                    continue
+                print_json({'source': config['slug'],
+                            'articles': preview_articles(config, content, max_items)})
+                continue
+            stats = run_source_crawl(config, max_items=max_items, translate=args.translate)
+            if stats:
+                affected_days.update(stats['days'])
+        except Exception as e:
+            print(f"Error crawling {config['name']}: {e}", file=sys.stderr)
+
+    if affected_days and args.digest:
+        from digest import materialize_digests
+        materialize_digests(affected_days)
+
+
+def cmd_fetch(args):
+    os.makedirs(args.out_dir, exist_ok=True)
+    for config, _ in select_sources(args.source):
+        started = time.perf_counter()
+        content = fetch_page(seed_url(config))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not content:
+            print(f"{config['slug']}: fetch failed ({elapsed_ms:.0f} ms)", file=sys.stderr)
+            continue
+        ext = 'html' if config['source_type'] == 'html' else 'xml'
+        path = os.path.join(args.out_dir, f"{config['slug']}.{ext}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"{config['slug']}: {len(content)} bytes in {elapsed_ms:.0f} ms → {path}")
+
+
+def cmd_parse(args):
+    config, limit = select_sources([args.source])[0]
+    content = load_seed(config, args.input)
+    if not content:
+        raise SystemExit(f"Failed to fetch {config['slug']}")
+    articles = parse_articles(config, content)
+    print_json(articles[:args.limit] if args.limit is not None else articles)
+
+
+def cmd_translate(args):
+    raw = read_input(args.input) if args.input else ' '.join(args.text)
+    text = prepare_for_translation(raw, max_tokens=args.max_tokens)
+    if args.dry_run or not text:
+        print_json({'input_tokens': estimate_tokens(raw), 'cleaned_tokens': estimate_tokens(text), 'cleaned': text})
+        return
+    from translator import translate_text
+    print(translate_text(text))
+
+
+def cmd_replay(args):
+    config, limit = select_sources([args.source])[0]
+    content = read_input(args.input)
+    max_items = resolve_max_items(args, limit)
+    if args.dry_run:
+        print_json({'source': config['slug'], 'articles': preview_articles(config, content, max_items)})
+        return
+    stats = run_source_crawl(config, max_items=max_items, translate=args.translate, seed_content=content)
+    if stats and stats['days'] and args.digest:
+        from digest import materialize_digests
+        materialize_digests(stats['days'])
+
+
+def cmd_bench(args):
+    # 1) 무거운 SDK import 비용 (이 CLI가 단계별로 미루는 비용)
+    for name in HEAVY_MODULES:
+        if name in sys.modules:
+            print(f"import {name}: already loaded")
+            continue
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            print(f"import {name}: {(time.perf_counter() - started) * 1000:.1f} ms")
+        except ImportError:
+            print(f"import {name}: not installed")
+
+    # 2) 파싱 + 번역 입력 정규화 처리량 (네트워크 제외)
+    if not args.source:
+        return
+    config, _ = select_sources([args.source])[0]
+    content = load_seed(config, args.input)
+    if not content:
+        raise SystemExit(f"Failed to fetch {config['slug']}")
+    token_budget = config['crawl_policy'].get('summary_token_budget', DEFAULT_SUMMARY_TOKEN_BUDGET)
+    parse_ms, clean_ms, articles = [], [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        articles = parse_articles(config, content)
+        parse_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        for article in articles:
+            prepare_for_translation(article.get('excerpt'), max_tokens=token_budget)
+        clean_ms.append((time.perf_counter() - started) * 1000)
+    print(f"{config['slug']}: {len(articles)} articles, {len(content)} bytes, repeat={args.repeat}")
+    print(f"  parse: first {parse_ms[0]:.2f} ms, avg {sum(parse_ms) / len(parse_ms):.2f} ms")
+    print(f"  clean: first {clean_ms[0]:.2f} ms, avg {sum(clean_ms) / len(clean_ms):.2f} ms")
+
+
+# ── Argument Parsing ─────────────────────────────────────────
+
+def add_stage_flags(parser):
+    parser.add_argument('--max-items', type=int, default=None, help="override per-source limit")
+    parser.add_argument('--dry-run', action='store_true', help="fetch/parse only, no save or translate")
+    parser.add_argument('--no-translate', dest='translate', action='store_false', help="save items without translating")
+    parser.add_argument('--no-digest', dest='digest', action='store_false', help="skip digest snapshot update")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Crawler command line")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('crawl', help="run the full pipeline")
+    p.add_argument('--source', action='append', help="source slug (repeatable, default: all)")
+    add_stage_flags(p)
+    p.set_defaults(func=cmd_crawl)
+
+    p = sub.add_parser('fetch', help="download seed pages without parsing")
+    p.add_argument('--source', action='append', help="source slug (repeatable, default: all)")
+    p.add_argument('--out-dir', default=SEED_DIR)
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser('parse', help="parse a seed page and print articles")
+    p.add_argument('--source', required=True)
+    p.add_argument('--input', help="saved seed file (default: fetch)")
+    p.add_argument('--limit', type=int, default=None)
+    p.set_defaults(func=cmd_parse)
+
+    p = sub.add_parser('translate', help="normalize and translate text")
+    p.add_argument('text', nargs='*')
+    p.add_argument('--input', help="read text from file")
+    p.add_argument('--max-tokens', type=int, default=DEFAULT_SUMMARY_TOKEN_BUDGET)
+    p.add_argument('--dry-run', action='store_true', help="show cleaned text only")
+    p.set_defaults(func=cmd_translate)
+
+    p = sub.add_parser('replay', help="run the pipeline on a saved seed page")
+    p.add_argument('--source', required=True)
+    p.add_argument('--input', required=True)
+    add_stage_flags(p)
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser('bench', help="time SDK imports and parse/clean throughput")
+    p.add_argument('--source')
+    p.add_argument('--input', help="saved seed file (default: fetch)")
+    p.add_argument('--repeat', type=int, default=20)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import sys
+import hashlib
+import argparse
+import threading
+from collections import Counter
+
+from storage import insert_crawl_logs, compact_crawl_logs
+
+# Layer 3: Deterministic Execution
+# crawl_logs 기록 서브시스템
+# - 레벨별 샘플링: error/warn은 전부, success는 일부만 기록
+# - 소스별 집계: 런마다 소스당 summary 행 1건
+# - 비동기 버퍼링: 백그라운드 스레드가 배치 insert (크롤링 루프는 대기하지 않음)
+# - 보존 정책: 오래된 런의 로그는 compact_crawl_logs()로 롤업
+
+DEFAULT_SUCCESS_SAMPLE_RATE = 0.1
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL_S = 5.0
+DEFAULT_RETENTION_DAYS = 30
+
+STATUS_LEVELS = {'success': 'info', 'skipped': 'warn', 'error': 'error'}
+
+
+def is_sampled(url, rate):
+    """URL 해시 기반 결정적 샘플링 (재실행해도 같은 아이템이 선택됨)"""
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    bucket = int(hashlib.sha256((url or '').encode('utf-8')).hexdigest()[:8], 16)
+    return bucket / 0xFFFFFFFF < rate
+
+
+class CrawlLogger:
+    """런 + 소스 단위 로거. close() 시 summary 행을 남기고 남은 버퍼를 flush"""
+
+    def __init__(self, run_id, source_id=None, success_sample_rate=DEFAULT_SUCCESS_SAMPLE_RATE,
+                 batch_size=DEFAULT_BATCH_SIZE, flush_interval_s=DEFAULT_FLUSH_INTERVAL_S,
+                 sink=insert_crawl_logs):
+        self.run_id = run_id
+        self.source_id = source_id
+        self.success_sample_rate = success_sample_rate
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.sink = sink
+        self.counts = Counter()
+        self.sampled = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def log(self, url, status='success', item_id=None, error_message=None):
+        """아이템별 결과 기록 (집계는 항상, 행 insert는 샘플링)"""
+        self.counts[status] += 1
+        level = STATUS_LEVELS.get(status, 'info')
+        if level == 'info':
+            if not is_sampled(url, self.success_sample_rate):
+                return
+            self.sampled += 1
+        message = f"URL: {url} | Status: {status} | Error: {error_message}" if error_message else f"URL: {url} {status}"
+        self._enqueue({
+            'run_id': self.run_id,
+            'source_id': self.source_id,
+            'level': level,
+            'message': message,
+            'meta': {'url': url, 'item_id': item_id},
+        })
+
+    def _enqueue(self, row):
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if rows:
+            try:
+                self.sink(rows)
+            except Exception as e:
+                print(f"Error flushing crawl_logs: {e}", file=sys.stderr)
+
+    def _loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self._flush()
+
+    def summary_row(self):
+        errors = self.counts['error']
+        if errors and not self.counts['success']:
+            level = 'error'
+        elif errors or self.counts['skipped']:
+            level = 'warn'
+        else:
+            level = 'info'
+        return {
+            'run_id': self.run_id,
+            'source_id': self.source_id,
+            'level': level,
+            'message': (f"Summary: {self.counts['success']} success, "
+                        f"{self.counts['skipped']} skipped, {errors} error"),
+            'meta': {
+                'summary': True,
+                'counts': dict(self.counts),
+                'sampled_success': self.sampled,
+                'success_sample_rate': self.success_sample_rate,
+            },
+        }
+
+    def close(self):
+        if self._closed:
+            return
+        self._enqueue(self.summary_row())
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 블록 밖으로 나가는 예외도 error 행 + summary 카운트에 남김
+        if exc is not None:
+            self.log(None, 'error', error_message=repr(exc))
+        self.close()
+        return False
+
+
+if __name__ == "__main__":
+    # 보존 작업: N일 지난 런의 아이템별 로그를 롤업 행으로 압축
+    parser = argparse.ArgumentParser(description="Compact old crawl_logs into rollups")
+    parser.add_argument('--days', type=int, default=DEFAULT_RETENTION_DAYS)
+    args = parser.parse_args()
+    removed = compact_crawl_logs(args.days)
+    print(f"Compacted crawl_logs older than {args.days} days: {removed} rows removed")
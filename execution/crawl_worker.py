@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import socket
+import argparse
+
+from storage import start_crawl_run, finish_crawl_run
+from scraper import SOURCES, run_source_crawl
+from lease import LEASE_TTL_S, LeaseHeartbeat, get_lease_store
+from digest import materialize_digests
+
+# Layer 3: Deterministic Execution
+# 멀티 워커 모드: 여러 프로세스/머신이 같은 run_id로 소스 리스를 나눠 처리
+#   1) 첫 워커가 crawl_runs 행 생성 후 run_id 출력 (또는 CRAWL_RUN_ID로 지정)
+#   2) 각 워커는 리스를 잡고 하트비트하며 소스를 크롤링
+#   3) 워커가 죽으면 리스 만료 후 다른 워커가 재할당
+#   4) 남은 리스가 없으면 running 런을 조건부 update로 종료한 워커 1개만 다이제스트 스냅샷 갱신
+
+POLL_INTERVAL_S = 5
+MAX_STORE_ERRORS = 3
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def finalize_run(run_id, summary):
+    """
+    리스 결과를 합산해 crawl_runs 행 1건으로 종료 + 변경된 일자 다이제스트 재생성
+    종료 권한 획득과 상태/통계 기록은 한 번의 조건부 update (status = 'running')
+    반환: 이 워커가 종료했으면 True, 다른 워커가 먼저 종료했으면 False, 실패 시 None
+    """
+    if summary['failed'] == 0:
+        status = 'completed'
+    elif summary['done'] > 0:
+        status = 'partial'
+    else:
+        status = 'failed'
+    finished = finish_crawl_run(run_id, status,
+                                items_found=summary['items_found'],
+                                items_created=summary['items_created'],
+                                items_updated=summary['items_updated'],
+                                items_skipped=summary['items_skipped'],
+                                total_sources=summary['total_sources'],
+                                error_count=summary['failed'],
+                                only_running=True)
+    if finished:
+        materialize_digests(summary['days'])
+    return finished
+
+
+def run_worker(store, run_id, worker_id=None, sources=SOURCES, ttl_s=LEASE_TTL_S,
+               poll_interval_s=POLL_INTERVAL_S, crawl_fn=run_source_crawl):
+    """
+    리스가 모두 끝날 때까지 소스를 획득해 크롤링. 반환: 롤업 summary
+    리스 저장소 오류가 MAX_STORE_ERRORS회 이어지면 런을 종료하지 않고 None 반환 (다른 워커/재실행이 이어받음)
+    """
+    worker_id = worker_id or default_worker_id()
+    by_key = {config['slug']: (config, limit) for config, limit in sources}
+    if not store.seed(run_id, list(by_key)):
+        print(f"Worker {worker_id}: failed to seed leases for run {run_id}", file=sys.stderr)
+        return None
+    print(f"Worker {worker_id} joined run {run_id}")
+
+    store_errors = 0
+    while True:
+        key = store.claim(run_id, worker_id, ttl_s)
+        summary = store.summary(run_id) if key is None else None
+        if key is False or (key is None and summary is None):
+            # claim/조회 실패를 "남은 리스 없음"으로 취급하지 않음
+            store_errors += 1
+            if store_errors >= MAX_STORE_ERRORS:
+                print(f"Worker {worker_id}: lease store unavailable, leaving run {run_id} open", file=sys.stderr)
+                return None
+            time.sleep(poll_interval_s)
+            continue
+        store_errors = 0
+
+        if key is None:
+            if summary['total_sources'] == 0:
+                print(f"Worker {worker_id}: no leases found for run {run_id}", file=sys.stderr)
+                return None
+            if summary['pending'] + summary['leased'] == 0:
+                finished = finalize_run(run_id, summary)
+                if finished is None:
+                    # 런은 running으로 남아 재실행한 워커가 다시 롤업할 수 있음
+                    print(f"Worker {worker_id}: failed to finalize run {run_id}, leaving it open", file=sys.stderr)
+                    return None
+                if not finished:
+                    print(f"Worker {worker_id}: run {run_id} finalized by another worker")
+                return summary
+            # 다른 워커가 처리 중 — 만료되면 재할당받기 위해 대기
+            time.sleep(poll_interval_s)
+            continue
+
+        if key not in by_key:
+            store.complete(run_id, key, worker_id, 'failed', error_message='unknown source')
+            continue
+
+        config, limit = by_key[key]
+        print(f"Worker {worker_id} leased: {key}")
+        stats, error_message = None, None
+        with LeaseHeartbeat(store, run_id, worker_id, ttl_s):
+            try:
+                stats = crawl_fn(config, max_items=limit, run_id=run_id)
+            except Exception as e:
+                print(f"Error crawling {config['name']}: {e}", file=sys.stderr)
+                error_message = str(e)
+
+        status = 'done' if stats and stats.get('status') == 'completed' else 'failed'
+        if not store.complete(run_id, key, worker_id, status, stats=stats, error_message=error_message):
+            print(f"Lease lost for {key}; result discarded", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lease-based crawl worker")
+    parser.add_argument('--run-id', default=os.getenv("CRAWL_RUN_ID"))
+    parser.add_argument('--worker-id', default=os.getenv("WORKER_ID"))
+    parser.add_argument('--backend', default=None, help="supabase | sqlite (default: LEASE_BACKEND)")
+    parser.add_argument('--ttl', type=int, default=LEASE_TTL_S)
+    args = parser.parse_args()
+
+    run_id = args.run_id
+    if not run_id:
+        run = start_crawl_run()
+        if not run:
+            print("Failed to start crawl run.", file=sys.stderr)
+            sys.exit(1)
+        run_id = run['id']
+        print(f"Crawl Run started: {run_id} (share with other workers via CRAWL_RUN_ID)")
+
+    summary = run_worker(get_lease_store(args.backend), run_id,
+                         worker_id=args.worker_id, ttl_s=args.ttl)
+    if summary is None:
+        sys.exit(1)
+    print(f"Run {run_id} rolled up: {summary}")
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from storage import list_items_published_between, upsert_digest_snapshots, delete_stale_digest_snapshots
+
+# Layer 3: Deterministic Execution
+# 런 종료 후 일자별/소스별 다이제스트 스냅샷 생성 (뷰어는 key 1건 조회로 렌더링)
+# - key: "day:YYYY-MM-DD" / "day:YYYY-MM-DD:source:<source_id>"
+# - 저장소: digest_snapshots 테이블(기본) 또는 정적 JSON 파일 (DIGEST_DIR)
+# - 런에서 변경된 아이템의 발행일만 다시 생성 (일자 단위로 교체: 생성되지 않은 소스 key는 삭제)
+# - items / item_translations 변경 시 DB 트리거가 해당 일자 스냅샷을 지움 (schema.sql 참고)
+
+DIGEST_TZ = timezone(timedelta(hours=9))  # 뷰어 기준 KST
+DIGEST_LANG = 'ko'
+
+
+def parse_published_at(value):
+    """ISO 8601 / RFC 822(RSS pubDate) 문자열을 aware datetime으로. 실패 시 None"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip()
+        try:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                dt = parsedate_to_datetime(text)
+            except (TypeError, ValueError):
+                return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def digest_day(published_at):
+    """발행 시각 → 다이제스트 일자(KST, YYYY-MM-DD)"""
+    dt = parse_published_at(published_at) or datetime.now(timezone.utc)
+    return dt.astimezone(DIGEST_TZ).date().isoformat()
+
+
+def day_key(day, source_id=None):
+    return f"day:{day}:source:{source_id}" if source_id else f"day:{day}"
+
+
+def build_entry(row):
+    """아이템 행 → 스냅샷 항목 (뷰어 조인 결과와 같은 모양, 한국어 번역만 유지)"""
+    translations = [
+        {'title_translated': t.get('title_translated'), 'summary_translated': t.get('summary_translated')}
+        for t in (row.get('item_translations') or [])
+        if t.get('lang', DIGEST_LANG) == DIGEST_LANG
+    ]
+    return {
+        'id': row['id'],
+        'title': row.get('title'),
+        'summary': row.get('summary'),
+        'author': row.get('author'),
+        'published_at': row.get('published_at'),
+        'canonical_url': row.get('canonical_url'),
+        'source_id': row.get('source_id'),
+        'raw': row.get('raw') or {},
+        'sources': row.get('sources'),
+        'item_translations': translations[:1],
+    }
+
+
+def build_day_snapshots(day, rows):
+    """하루치 아이템으로 전체 스냅샷 1건 + 소스별 스냅샷 생성"""
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
+    entries = sorted((build_entry(r) for r in rows),
+                     key=lambda e: parse_published_at(e['published_at']) or epoch, reverse=True)
+    updated_at = datetime.now(timezone.utc).isoformat()
+
+    by_source = {}
+    for entry in entries:
+        by_source.setdefault(entry['source_id'], []).append(entry)
+
+    snapshots = [{
+        'key': day_key(day), 'day': day, 'source_id': None,
+        'item_count': len(entries), 'payload': entries, 'updated_at': updated_at,
+    }]
+    for source_id, source_entries in by_source.items():
+        snapshots.append({
+            'key': day_key(day, source_id), 'day': day, 'source_id': source_id,
+            'item_count': len(source_entries), 'payload': source_entries, 'updated_at': updated_at,
+        })
+    return snapshots
+
+
+def write_digest_snapshots(snapshots):
+    """digest_snapshots에 upsert 후 같은 일자의 나머지 key 삭제"""
+    if not upsert_digest_snapshots(snapshots):
+        return False
+    keys_by_day = {}
+    for snap in snapshots:
+        keys_by_day.setdefault(snap['day'], set()).add(snap['key'])
+    return all(delete_stale_digest_snapshots(day, keys) for day, keys in keys_by_day.items())
+
+
+class JsonDigestWriter:
+    """
+    스냅샷을 정적 JSON 파일로 저장: <out_dir>/<day>.json, <out_dir>/<day>/<source_id>.json
+    일자 단위로 교체: 이번에 생성되지 않은 소스 파일은 삭제
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+
+    def __call__(self, snapshots):
+        written = set()
+        for snap in snapshots:
+            if snap['source_id']:
+                path = os.path.join(self.out_dir, snap['day'], f"{snap['source_id']}.json")
+            else:
+                path = os.path.join(self.out_dir, f"{snap['day']}.json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snap, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            written.add(path)
+
+        for day in {snap['day'] for snap in snapshots}:
+            day_dir = os.path.join(self.out_dir, day)
+            if not os.path.isdir(day_dir):
+                continue
+            for name in os.listdir(day_dir):
+                path = os.path.join(day_dir, name)
+                if name.endswith('.json') and path not in written:
+                    os.remove(path)
+        return True
+
+
+def get_digest_writer():
+    """DIGEST_DIR가 있으면 JSON 파일, 없으면 digest_snapshots 테이블"""
+    out_dir = os.getenv("DIGEST_DIR")
+    return JsonDigestWriter(out_dir) if out_dir else write_digest_snapshots
+
+
+def materialize_digests(days, writer=None):
+    """변경된 일자의 스냅샷만 재생성. 반환: 작성한 스냅샷 수"""
+    writer = writer or get_digest_writer()
+    written = 0
+    for day in sorted(set(days)):
+        start = datetime.fromisoformat(day).replace(tzinfo=DIGEST_TZ)
+        rows = list_items_published_between(start.isoformat(), (start + timedelta(days=1)).isoformat())
+        if rows is None:
+            print(f"Skipping digest for {day}: item query failed", file=sys.stderr)
+            continue
+        snapshots = build_day_snapshots(day, rows)
+        if writer(snapshots):
+            written += len(snapshots)
+            print(f"Digest {day}: {len(rows)} items, {len(snapshots)} snapshots")
+    return written
+
+
+if __name__ == "__main__":
+    # 백필: 최근 N일 또는 지정 일자 스냅샷 재생성
+    parser = argparse.ArgumentParser(description="Materialize per-day digest snapshots")
+    parser.add_argument('days', nargs='*', help="YYYY-MM-DD (KST)")
+    parser.add_argument('--recent', type=int, default=1, help="rebuild the last N days when no day is given")
+    args = parser.parse_args()
+
+    today = datetime.now(DIGEST_TZ).date()
+    days = args.days or [(today - timedelta(days=i)).isoformat() for i in range(args.recent)]
+    materialize_digests(days)
@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+# Layer 3: Deterministic Execution
+# 멀티 워커 크롤링용 소스 리스 저장소
+# - supabase: crawl_leases 테이블 + claim_crawl_lease() DB 함수
+# - sqlite: 로컬/테스트용 대체 구현 (같은 파일을 공유하는 프로세스 간 동작)
+
+LEASE_TTL_S = 120
+MAX_LEASE_ATTEMPTS = 3
+DEFAULT_SQLITE_PATH = os.path.join('.tmp', 'crawl_leases.db')
+
+STAT_FIELDS = ('items_found', 'items_created', 'items_updated', 'items_skipped')
+
+
+def rollup_leases(rows):
+    """리스 행 목록을 상태별 건수 + 아이템 합계로 집계"""
+    summary = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+    for field in STAT_FIELDS:
+        summary[field] = 0
+    for row in rows:
+        summary[row['status']] = summary.get(row['status'], 0) + 1
+        for field in STAT_FIELDS:
+            summary[field] += row.get(field) or 0
+    summary['total_sources'] = len(rows)
+    summary['days'] = sorted({day for row in rows for day in (row.get('affected_days') or [])})
+    return summary
+
+
+# ── SQLite (local stand-in) ──────────────────────────────────
+
+SQLITE_SCHEMA = """
+create table if not exists crawl_leases (
+  run_id            text not null,
+  source_key        text not null,
+  status            text not null default 'pending',
+  worker_id         text,
+  lease_expires_at  real,
+  heartbeat_at      real,
+  attempts          integer not null default 0,
+  items_found       integer not null default 0,
+  items_created     integer not null default 0,
+  items_updated     integer not null default 0,
+  items_skipped     integer not null default 0,
+  affected_days     text,
+  error_message     text,
+  primary key (run_id, source_key)
+);
+"""
+
+
+class SqliteLeaseStore:
+    """
+    crawl_leases의 SQLite 대체 구현. 매 호출마다 커넥션을 열어 스레드/프로세스 간 공유 가능
+    claim() 반환: source_key, 남은 리스가 없으면 None, 저장소 오류 시 False (Supabase 구현과 동일)
+    """
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, max_attempts=MAX_LEASE_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def seed(self, run_id, source_keys):
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "insert or ignore into crawl_leases (run_id, source_key) values (?, ?)",
+                [(run_id, key) for key in source_keys],
+            )
+        return True
+
+    def claim(self, run_id, worker_id, ttl_s):
+        try:
+            return self._claim(run_id, worker_id, ttl_s)
+        except sqlite3.Error as e:
+            print(f"Error claiming crawl_lease: {e}", file=sys.stderr)
+            return False
+
+    def _claim(self, run_id, worker_id, ttl_s):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # begin immediate: 다른 워커의 동시 claim을 직렬화
+            conn.execute("begin immediate")
+            try:
+                conn.execute(
+                    "update crawl_leases set status = 'failed', "
+                    "error_message = coalesce(error_message, 'lease expired too many times') "
+                    "where run_id = ? and status = 'leased' and lease_expires_at < ? and attempts >= ?",
+                    (run_id, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "select source_key from crawl_leases where run_id = ? "
+                    "and (status = 'pending' or (status = 'leased' and lease_expires_at < ?)) "
+                    "order by attempts, source_key limit 1",
+                    (run_id, now),
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "update crawl_leases set status = 'leased', worker_id = ?, attempts = attempts + 1, "
+                        "lease_expires_at = ?, heartbeat_at = ? where run_id = ? and source_key = ?",
+                        (worker_id, now + ttl_s, now, run_id, row['source_key']),
+                    )
+                conn.execute("commit")
+            except Exception:
+                conn.execute("rollback")
+                raise
+        return row['source_key'] if row else None
+
+    def heartbeat(self, run_id, worker_id, ttl_s):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "update crawl_leases set heartbeat_at = ?, lease_expires_at = ? "
+                "where run_id = ? and worker_id = ? and status = 'leased'",
+                (now, now + ttl_s, run_id, worker_id),
+            )
+            return cur.rowcount
+
+    def complete(self, run_id, source_key, worker_id, status, stats=None, error_message=None):
+        stats = stats or {}
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "update crawl_leases set status = ?, lease_expires_at = null, "
+                "items_found = ?, items_created = ?, items_updated = ?, items_skipped = ?, "
+                "affected_days = ?, error_message = ? "
+                "where run_id = ? and source_key = ? and worker_id = ? and status = 'leased'",
+                (status, *(stats.get(f, 0) for f in STAT_FIELDS), json.dumps(stats.get('days', [])),
+                 error_message, run_id, source_key, worker_id),
+            )
+            return cur.rowcount > 0
+
+    def summary(self, run_id):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("select * from crawl_leases where run_id = ?", (run_id,)).fetchall()
+        leases = [dict(r) for r in rows]
+        for lease in leases:
+            lease['affected_days'] = json.loads(lease['affected_days'] or '[]')
+        return rollup_leases(leases)
+
+
+# ── Supabase ─────────────────────────────────────────────────
+
+class SupabaseLeaseStore:
+    """storage.py의 crawl_leases 함수 래퍼"""
+
+    def __init__(self, max_attempts=MAX_LEASE_ATTEMPTS):
+        self.max_attempts = max_attempts
+
+    def seed(self, run_id, source_keys):
+        from storage import seed_crawl_leases
+        return seed_crawl_leases(run_id, source_keys)
+
+    def claim(self, run_id, worker_id, ttl_s):
+        from storage import claim_crawl_lease
+        lease = claim_crawl_lease(run_id, worker_id, ttl_s, max_attempts=self.max_attempts)
+        if lease is False:
+            return False
+        return lease['source_key'] if lease else None
+
+    def heartbeat(self, run_id, worker_id, ttl_s):
+        from storage import heartbeat_crawl_leases
+        return heartbeat_crawl_leases(run_id, worker_id, ttl_s)
+
+    def complete(self, run_id, source_key, worker_id, status, stats=None, error_message=None):
+        from storage import complete_crawl_lease
+        return complete_crawl_lease(run_id, source_key, worker_id, status,
+                                    stats=stats, error_message=error_message)
+
+    def summary(self, run_id):
+        from storage import list_crawl_leases
+        rows = list_crawl_leases(run_id)
+        return rollup_leases(rows) if rows is not None else None
+
+
+def get_lease_store(backend=None):
+    """LEASE_BACKEND 환경변수(supabase|sqlite)에 따라 저장소 생성"""
+    backend = backend or os.getenv("LEASE_BACKEND", "supabase")
+    if backend == 'sqlite':
+        return SqliteLeaseStore(os.getenv("LEASE_DB_PATH", DEFAULT_SQLITE_PATH))
+    if backend == 'supabase':
+        return SupabaseLeaseStore()
+    raise ValueError(f"Unknown lease backend: {backend}")
+
+
+# ── Heartbeat ────────────────────────────────────────────────
+
+class LeaseHeartbeat:
+    """with 블록 동안 백그라운드 스레드로 ttl/3 간격 리스 연장"""
+
+    def __init__(self, store, run_id, worker_id, ttl_s=LEASE_TTL_S):
+        self.store = store
+        self.run_id = run_id
+        self.worker_id = worker_id
+        self.ttl_s = ttl_s
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.ttl_s / 3):
+            try:
+                self.store.heartbeat(self.run_id, self.worker_id, self.ttl_s)
+            except Exception as e:
+                print(f"Lease heartbeat failed: {e}", file=sys.stderr)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
@@ -2,16 +2,17 @@ import os
 import re
 import sys
 import time
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from dotenv import load_dotenv
 
 from storage import (
     get_or_create_source, upsert_item, upsert_translation,
-    start_crawl_run, finish_crawl_run, log_crawl,
+    start_crawl_run, finish_crawl_run,
 )
+from crawl_logger import CrawlLogger, DEFAULT_SUCCESS_SAMPLE_RATE
+from digest import digest_day, materialize_digests
 from translator import translate_text
+from text_cleaner import DEFAULT_SUMMARY_TOKEN_BUDGET, normalize_title, prepare_for_translation
 from proxy_utility import get_request_params
 
 load_dotenv()
@@ -19,6 +20,7 @@ load_dotenv()
 # Layer 3: Deterministic Execution
 # Target: Y Combinator Blog (List + Detail)
 # Schema: V2 (sources → items → item_translations + crawl_runs/logs)
+# requests/bs4는 fetch/parse 단계에서만 import (CLI 콜드 스타트 단축, cli.py 참고)
 
 # ── Source Configs ───────────────────────────────────────────
 
@@ -105,10 +107,24 @@ YT_YC_SOURCE = {
     'crawl_policy': {'rate_limit_ms': 2000, 'max_items_per_run': 10},
 }
 
+# (config, max_items) — 단일 프로세스/멀티 워커 모드 공용 소스 목록
+SOURCES = [
+    (YC_SOURCE, 2),
+    (VB_SOURCE, 2),
+    (TC_SOURCE, 2),
+    (SIFTED_SOURCE, 2),
+    (TIA_SOURCE, 2),
+    (GW_SOURCE, 2),
+    (EU_SOURCE, 2),
+    (YT_YC_SOURCE, 2),
+]
+
 
 # ── HTTP Fetch ───────────────────────────────────────────────
 
 def fetch_page(url, retries=3):
+    import requests
+
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
     }
@@ -136,6 +152,8 @@ def fetch_page(url, retries=3):
 # ── Parsers ──────────────────────────────────────────────────
 
 def parse_article_detail(url):
+    from bs4 import BeautifulSoup
+
     html = fetch_page(url)
     if not html:
         return None
@@ -151,6 +169,8 @@ def parse_article_detail(url):
 
 
 def parse_yc_blog_list(html):
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, 'html.parser')
     articles = []
 
@@ -225,6 +245,8 @@ def parse_yc_blog_list(html):
     return articles
 
 def parse_rss_feed(xml_content):
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(xml_content, 'xml')
     except Exception:
@@ -266,6 +288,8 @@ def parse_rss_feed(xml_content):
     return items
 
 def parse_youtube_rss(xml_content):
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(xml_content, 'xml')
     except Exception:
@@ -304,10 +328,25 @@ def parse_youtube_rss(xml_content):
     return items
 
 
+def parse_articles(source_config, content):
+    """소스 설정에 맞는 파서로 목록 페이지/피드 파싱"""
+    if source_config.get('parser_type') == 'youtube':
+        return parse_youtube_rss(content)
+    if source_config['source_type'] == 'rss':
+        return parse_rss_feed(content)
+    return parse_yc_blog_list(content)
+
+
 # ── Main Pipeline ────────────────────────────────────────────
 
-def run_source_crawl(source_config, max_items=3):
-    """범용 소스 크롤링 파이프라인"""
+def run_source_crawl(source_config, max_items=3, run_id=None, translate=True, seed_content=None):
+    """
+    범용 소스 크롤링 파이프라인.
+    run_id를 넘기면 공유 런(멀티 워커 모드)에 합류하며 런 시작/종료는 호출자가 담당한다.
+    translate=False면 번역 단계를 건너뛰고, seed_content가 있으면 fetch 대신 사용한다 (replay).
+    반환: {status, items_found, items_created, items_updated, items_skipped, days} or None
+    (days: 이번 런에서 변경된 아이템의 다이제스트 일자 목록)
+    """
     # 인자 필터링 (get_or_create_source에 필요한 것만 전달)
     source = get_or_create_source(
         slug=source_config['slug'],
@@ -319,109 +358,122 @@ def run_source_crawl(source_config, max_items=3):
     )
     if not source:
         print(f"Failed to get/create source: {source_config['name']}", file=sys.stderr)
-        return
+        return None
     source_id = source['id']
     print(f"\nSource: {source['name']} ({source_id})")
 
-    run = start_crawl_run(source_id)
-    if not run:
-        print("Failed to start crawl run.", file=sys.stderr)
-        return
-    run_id = run['id']
-    print(f"Crawl Run started: {run_id}")
-
-    target_url = source_config.get('seed_url') or source_config['base_url']
-    print(f"Fetching from {target_url}...")
-    content = fetch_page(target_url)
-    if not content:
-        finish_crawl_run(run_id, 'failed', error_message='Failed to fetch seed page')
-        return
-
-    if source_config.get('parser_type') == 'youtube':
-        articles = parse_youtube_rss(content)
-    elif source_config['source_type'] == 'rss':
-        articles = parse_rss_feed(content)
-    else:
-        articles = parse_yc_blog_list(content)
-        
-    items_found = len(articles)
-    print(f"Found {items_found} articles.")
-
-    created = updated = skipped = 0
-    rate_limit_s = source_config['crawl_policy'].get('rate_limit_ms', 3000) / 1000
-
-    for article in articles[:max_items]:
-        print(f"\nProcessing: {article['title']}")
-        try:
-            # RSS인 경우 이미 요약이 있는 경우가 많으므로 detail fetch 생략 가능 (필요시 추가)
-            content_text = ""
-            if source_config['source_type'] != 'rss':
-                content_text = parse_article_detail(article['url'])
-
-            item_data = {
-                'title': article['title'],
-                'summary': article.get('excerpt'),
-                'author': article.get('author'),
-                'published_at': article.get('published_date') if article.get('published_date') else datetime.now().isoformat(),
-                'canonical_url': article['url'],
-                'content_text': content_text,
-                'language': 'en',
-                'source_item_id': article['url'].rstrip('/').split('/')[-1],
-                'raw': {
-                    'source_url': source_config['base_url'],
-                    'crawled_at': datetime.now().isoformat(),
-                },
-            }
-
-            item, action = upsert_item(source_id, item_data)
-            if action == 'error' or not item:
-                log_crawl(run_id, article['url'], 'error', error_message='upsert failed')
+    owns_run = run_id is None
+    if owns_run:
+        run = start_crawl_run(source_id)
+        if not run:
+            print("Failed to start crawl run.", file=sys.stderr)
+            return None
+        run_id = run['id']
+        print(f"Crawl Run started: {run_id}")
+
+    # 성공 로그는 샘플링, 소스별 summary 1행 + 비동기 배치 insert
+    with CrawlLogger(run_id, source_id, success_sample_rate=source_config['crawl_policy'].get(
+            'log_success_sample_rate', DEFAULT_SUCCESS_SAMPLE_RATE)) as logger:
+        target_url = source_config.get('seed_url') or source_config['base_url']
+        if seed_content is None:
+            print(f"Fetching from {target_url}...")
+            content = fetch_page(target_url)
+        else:
+            content = seed_content
+        if not content:
+            logger.log(target_url, 'error', error_message='Failed to fetch seed page')
+            if owns_run:
+                finish_crawl_run(run_id, 'failed', error_message='Failed to fetch seed page')
+            return {'status': 'failed', 'items_found': 0, 'items_created': 0,
+                    'items_updated': 0, 'items_skipped': 0, 'days': []}
+
+        articles = parse_articles(source_config, content)
+        items_found = len(articles)
+        print(f"Found {items_found} articles.")
+
+        created = updated = skipped = 0
+        affected_days = set()
+        rate_limit_s = source_config['crawl_policy'].get('rate_limit_ms', 3000) / 1000
+        summary_budget = source_config['crawl_policy'].get('summary_token_budget', DEFAULT_SUMMARY_TOKEN_BUDGET)
+
+        for article in articles[:max_items]:
+            print(f"\nProcessing: {article['title']}")
+            try:
+                # RSS인 경우 이미 요약이 있는 경우가 많으므로 detail fetch 생략 가능 (필요시 추가)
+                content_text = ""
+                if source_config['source_type'] != 'rss':
+                    content_text = parse_article_detail(article['url'])
+
+                item_data = {
+                    'title': article['title'],
+                    'summary': article.get('excerpt'),
+                    'author': article.get('author'),
+                    'published_at': article.get('published_date') if article.get('published_date') else datetime.now().isoformat(),
+                    'canonical_url': article['url'],
+                    'content_text': content_text,
+                    'language': 'en',
+                    'source_item_id': article['url'].rstrip('/').split('/')[-1],
+                    'raw': {
+                        'source_url': source_config['base_url'],
+                        'crawled_at': datetime.now().isoformat(),
+                    },
+                }
+
+                item, action = upsert_item(source_id, item_data)
+                if action == 'error' or not item:
+                    logger.log(article['url'], 'error', error_message='upsert failed')
+                    skipped += 1
+                    continue
+
+                if action == 'created':
+                    created += 1
+                else:
+                    updated += 1
+                item_id = item['id']
+                affected_days.add(digest_day(item_data['published_at']))
+                print(f"  Item {action}: {item_id}")
+
+                if not translate:
+                    logger.log(article['url'], 'success', item_id=item_id)
+                    time.sleep(rate_limit_s)
+                    continue
+
+                print(f"  Translating...")
+                title_kr = translate_text(normalize_title(article['title']))
+                # HTML/보일러플레이트 제거 + 토큰 예산 절단, 영상 임베드 등 비텍스트는 번역 생략
+                summary_src = prepare_for_translation(article.get('excerpt'), max_tokens=summary_budget)
+                summary_kr = translate_text(summary_src) if summary_src else ""
+
+                upsert_translation(item_id, 'ko', title=title_kr, summary=summary_kr)
+                print(f"  Translation saved (ko)")
+                logger.log(article['url'], 'success', item_id=item_id)
+
+            except Exception as e:
+                print(f"  Error: {e}", file=sys.stderr)
+                logger.log(article['url'], 'error', error_message=str(e))
                 skipped += 1
-                continue
 
-            if action == 'created':
-                created += 1
-            else:
-                updated += 1
-            item_id = item['id']
-            print(f"  Item {action}: {item_id}")
+            time.sleep(rate_limit_s)
 
-            print(f"  Translating...")
-            title_kr = translate_text(article['title'])
-            summary_kr = translate_text(article.get('excerpt')[:500]) if article.get('excerpt') else ""
-
-            upsert_translation(item_id, 'ko', title=title_kr, summary=summary_kr)
-            print(f"  Translation saved (ko)")
-            log_crawl(run_id, article['url'], 'success', item_id=item_id)
-
-        except Exception as e:
-            print(f"  Error: {e}", file=sys.stderr)
-            log_crawl(run_id, article['url'], 'error', error_message=str(e))
-            skipped += 1
-
-        time.sleep(rate_limit_s)
-
-    finish_crawl_run(run_id, 'completed',
-                     items_found=items_found,
-                     items_created=created,
-                     items_updated=updated,
-                     items_skipped=skipped)
-    print(f"\nCrawl Run completed: {source_config['name']}")
+        if owns_run:
+            finish_crawl_run(run_id, 'completed',
+                             items_found=items_found,
+                             items_created=created,
+                             items_updated=updated,
+                             items_skipped=skipped)
+        print(f"\nCrawl Run completed: {source_config['name']}")
+        return {'status': 'completed', 'items_found': items_found, 'items_created': created,
+                'items_updated': updated, 'items_skipped': skipped, 'days': sorted(affected_days)}
 
 if __name__ == "__main__":
-    sources = [
-        (YC_SOURCE, 2), 
-        (VB_SOURCE, 2),
-        (TC_SOURCE, 2),
-        (SIFTED_SOURCE, 2),
-        (TIA_SOURCE, 2),
-        (GW_SOURCE, 2),
-        (EU_SOURCE, 2),
-        (YT_YC_SOURCE, 2),
-    ]
-    
-    for config, limit in sources:
+    affected_days = set()
+    for config, limit in SOURCES:
         try:
-            run_source_crawl(config, max_items=limit)
+            stats = run_source_crawl(config, max_items=limit)
+            if stats:
+                affected_days.update(stats['days'])
         except Exception as e:
             print(f"Error crawling {config['name']}: {e}", file=sys.stderr)
+
+    # 변경된 일자의 다이제스트 스냅샷만 재생성
+    materialize_digests(affected_days)
@@ -1,7 +1,7 @@
 import os
 import sys
 import hashlib
-from supabase import create_client, Client
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +10,9 @@ load_dotenv()
 # Tables: sources, items, item_translations, crawl_runs, crawl_logs
 
 def get_supabase_client():
+    # supabase SDK는 실제 DB 접근 시에만 import (CLI 콜드 스타트 단축)
+    from supabase import create_client
+
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
 
@@ -71,42 +74,167 @@ def start_crawl_run(source_id=None):
     return res.data[0] if res.data else None
 
 
-def finish_crawl_run(run_id, status, items_found=0, items_created=0, items_updated=0, items_skipped=0, error_message=None):
-    """크롤링 런 종료"""
+RUN_STATUS_MAP = {
+    'completed': 'success',
+    'partial': 'partial_fail',
+}
+
+
+def finish_crawl_run(run_id, status, items_found=0, items_created=0, items_updated=0, items_skipped=0, error_message=None,
+                     total_sources=None, error_count=None, only_running=False):
+    """
+    크롤링 런 종료. 반환: 갱신되면 True, 오류 시 None
+    only_running=True면 아직 running인 런만 갱신하고, 이미 종료된 런이면 False (멀티 워커 롤업 권한 선출)
+    """
     supabase = get_supabase_client()
     if not supabase:
-        return
+        return None
     # 현재 DB 스키마 필드명 대응
     data = {
-        'status': 'success' if status == 'completed' else 'fail',
+        'status': RUN_STATUS_MAP.get(status, 'fail'),
         'ended_at': 'now()',
         'items_found': items_found,
         'items_saved': items_created + items_updated, # items_created -> items_saved
     }
+    # 멀티 워커 롤업 시에만 채워지는 필드
+    if total_sources is not None:
+        data['total_sources'] = total_sources
+    if error_count is not None:
+        data['error_count'] = error_count
     # error_message 필드가 없을 수 있으므로 로그로 대체하거나 처리
     try:
-        supabase.table('crawl_runs').update(data).eq('id', run_id).execute()
+        query = supabase.table('crawl_runs').update(data).eq('id', run_id)
+        if only_running:
+            query = query.eq('status', 'running')
+        res = query.execute()
+        return bool(res.data) if only_running else True
     except Exception as e:
         print(f"Error updating crawl_run: {e}", file=sys.stderr)
+        return None
 
 
-# ── Crawl Logs ───────────────────────────────────────────────
+# ── Crawl Leases ─────────────────────────────────────────────
+# 멀티 워커 모드: 소스 단위로 만료되는 리스를 잡고 처리한다 (lease.py 참고)
 
-def log_crawl(crawl_run_id, url, status='success', item_id=None, error_message=None):
-    """아이템별 크롤링 로그 기록"""
+def seed_crawl_leases(run_id, source_keys):
+    """런에 처리할 소스 리스 행 생성 (이미 있으면 무시)"""
     supabase = get_supabase_client()
     if not supabase:
-        return
-    # 현재 DB 스키마: crawl_run_id -> run_id, status -> level 등
+        return False
+    rows = [{'run_id': run_id, 'source_key': key} for key in source_keys]
     try:
-        supabase.table('crawl_logs').insert({
-            'run_id': crawl_run_id,
-            'level': 'info' if status == 'success' else 'error',
-            'message': f"URL: {url} | Status: {status} | Error: {error_message}" if error_message else f"URL: {url} success",
-            'meta': {'url': url, 'item_id': item_id}
+        supabase.table('crawl_leases').upsert(
+            rows, on_conflict='run_id,source_key', ignore_duplicates=True
+        ).execute()
+        return True
+    except Exception as e:
+        print(f"Error seeding crawl_leases: {e}", file=sys.stderr)
+        return False
+
+
+def claim_crawl_lease(run_id, worker_id, ttl_s, max_attempts=3):
+    """대기 중이거나 만료된 리스 1건 획득. 반환: lease row dict, 남은 리스가 없으면 None, 오류 시 False"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return False
+    # 원자적 획득을 위해 DB 함수(for update skip locked) 사용
+    try:
+        res = supabase.rpc('claim_crawl_lease', {
+            'p_run_id': run_id,
+            'p_worker_id': worker_id,
+            'p_ttl_seconds': int(ttl_s),
+            'p_max_attempts': max_attempts,
         }).execute()
+        return res.data[0] if res.data else None
+    except Exception as e:
+        print(f"Error claiming crawl_lease: {e}", file=sys.stderr)
+        return False
+
+
+def heartbeat_crawl_leases(run_id, worker_id, ttl_s):
+    """워커가 보유한 리스 만료 시각 연장. 반환: 연장된 행 수"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return 0
+    now = datetime.now(timezone.utc)
+    try:
+        res = supabase.table('crawl_leases').update({
+            'heartbeat_at': now.isoformat(),
+            'lease_expires_at': (now + timedelta(seconds=ttl_s)).isoformat(),
+        }).eq('run_id', run_id).eq('worker_id', worker_id).eq('status', 'leased').execute()
+        return len(res.data or [])
+    except Exception as e:
+        print(f"Error heartbeating crawl_leases: {e}", file=sys.stderr)
+        return 0
+
+
+def complete_crawl_lease(run_id, source_key, worker_id, status, stats=None, error_message=None):
+    """리스 종료 및 소스 결과 기록. 다른 워커가 이미 가져간 리스면 False"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return False
+    stats = stats or {}
+    data = {
+        'status': status,
+        'lease_expires_at': None,
+        'items_found': stats.get('items_found', 0),
+        'items_created': stats.get('items_created', 0),
+        'items_updated': stats.get('items_updated', 0),
+        'items_skipped': stats.get('items_skipped', 0),
+        'affected_days': stats.get('days', []),
+        'error_message': error_message,
+    }
+    try:
+        res = supabase.table('crawl_leases').update(data) \
+            .eq('run_id', run_id).eq('source_key', source_key) \
+            .eq('worker_id', worker_id).eq('status', 'leased').execute()
+        return bool(res.data)
     except Exception as e:
-        print(f"Error logging crawl: {e}", file=sys.stderr)
+        print(f"Error completing crawl_lease: {e}", file=sys.stderr)
+        return False
+
+
+def list_crawl_leases(run_id):
+    """런의 리스 목록 조회 (롤업용). 조회 실패 시 None (빈 목록과 구분)"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return None
+    try:
+        res = supabase.table('crawl_leases').select('*').eq('run_id', run_id).execute()
+        return res.data or []
+    except Exception as e:
+        print(f"Error listing crawl_leases: {e}", file=sys.stderr)
+        return None
+
+
+# ── Crawl Logs ───────────────────────────────────────────────
+
+def insert_crawl_logs(rows):
+    """crawl_logs 일괄 insert (CrawlLogger 버퍼 flush용)"""
+    if not rows:
+        return True
+    supabase = get_supabase_client()
+    if not supabase:
+        return False
+    try:
+        supabase.table('crawl_logs').insert(rows).execute()
+        return True
+    except Exception as e:
+        print(f"Error inserting crawl_logs: {e}", file=sys.stderr)
+        return False
+
+
+def compact_crawl_logs(older_than_days=30):
+    """오래된 런의 아이템별 로그를 (run, source)당 롤업 1행으로 압축. 반환: 삭제된 행 수"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return 0
+    try:
+        res = supabase.rpc('compact_crawl_logs', {'p_older_than_days': older_than_days}).execute()
+        return res.data or 0
+    except Exception as e:
+        print(f"Error compacting crawl_logs: {e}", file=sys.stderr)
+        return 0
 
 
 # ── Items — Upsert ───────────────────────────────────────────
@@ -179,6 +307,58 @@ def upsert_translation(item_id, lang, title=None, summary=None, content=None, tr
         return False
 
 
+# ── Digest Snapshots ─────────────────────────────────────────
+
+DIGEST_ITEM_COLUMNS = (
+    'id, title, summary, author, published_at, canonical_url, source_id, raw, '
+    'sources(name, type), item_translations(lang, title_translated, summary_translated)'
+)
+
+
+def list_items_published_between(start_iso, end_iso):
+    """[start, end) 구간에 발행된 아이템 + 소스 + 번역 조회 (최신순)"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return None
+    try:
+        res = supabase.table('items').select(DIGEST_ITEM_COLUMNS) \
+            .gte('published_at', start_iso).lt('published_at', end_iso) \
+            .order('published_at', desc=True).execute()
+        return res.data or []
+    except Exception as e:
+        print(f"Error listing items for digest: {e}", file=sys.stderr)
+        return None
+
+
+def upsert_digest_snapshots(rows):
+    """digest_snapshots에 upsert (key unique)"""
+    if not rows:
+        return True
+    supabase = get_supabase_client()
+    if not supabase:
+        return False
+    try:
+        supabase.table('digest_snapshots').upsert(rows, on_conflict='key').execute()
+        return True
+    except Exception as e:
+        print(f"Error upserting digest_snapshots: {e}", file=sys.stderr)
+        return False
+
+
+def delete_stale_digest_snapshots(day, keep_keys):
+    """일자 재생성 후 더 이상 만들어지지 않는 key(아이템이 사라진 소스 등) 삭제"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return False
+    try:
+        supabase.table('digest_snapshots').delete() \
+            .eq('day', day).not_.in_('key', list(keep_keys)).execute()
+        return True
+    except Exception as e:
+        print(f"Error deleting stale digest_snapshots: {e}", file=sys.stderr)
+        return False
+
+
 # ── Legacy compat ────────────────────────────────────────────
 
 def save_crawled_data(table_name, data):
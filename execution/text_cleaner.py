@@ -0,0 +1,147 @@
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+# Layer 3: Deterministic Execution
+# 번역 전 정규화: HTML → 텍스트, 보일러플레이트 제거, 토큰 예산 기준 문장 단위 절단
+# (web/lib/text.ts의 normalizeSummaryText / sanitizeSummaryForDisplay와 같은 규칙)
+
+DEFAULT_SUMMARY_TOKEN_BUDGET = 128
+
+NON_TEXT_MARKERS = ('[VIDEO_EMBED]',)
+
+SKIP_TAGS = {'script', 'style', 'noscript', 'iframe', 'svg', 'figure', 'figcaption', 'video', 'audio'}
+BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'blockquote', 'section', 'article', 'tr', 'table', 'hr'}
+
+BOILERPLATE_PATTERNS = [
+    # 꼬리말은 줄 끝까지 제거 (사이트 도메인의 '.'에서 멈추지 않도록)
+    re.compile(r'The post [^\n]{0,300}? appeared first on [^\n]*', re.I),
+    # "Continue reading"은 마지막 줄 전체이거나 »/→/… 로 끝나는 링크일 때만 (본문 중간 문구 보존)
+    re.compile(r'\n[ \t]*(Continue|Keep) reading\b[^\n]*$', re.I),
+    re.compile(r'\b(Continue|Keep) reading\b[^\n]{0,40}?(»|→|\.\.\.|…)\s*$', re.I),
+    re.compile(r'\bRead (the )?(full|more)( (story|article))?\b\s*(»|→|\.\.\.|…)?\s*$', re.I),
+    re.compile(r'Article URL:\s*https?://\S+', re.I),
+    re.compile(r'Comments URL:\s*https?://\S+', re.I),
+    # HN 피드 메타 줄: 줄 전체가 "Points: N" / "# Comments: N"일 때만 (본문 속 "Points: 12 players…" 보존)
+    re.compile(r'^[ \t]*Points:[ \t]*\d+[ \t]*$', re.I | re.M),
+    re.compile(r'^[ \t]*#[ \t]*Comments:[ \t]*\d+[ \t]*$', re.I | re.M),
+    re.compile(r'\[(…|\.\.\.|&#8230;)\]\s*$'),
+]
+
+SENTENCE_END = re.compile(r'(?<=[.!?。！？])\s+')
+# 토큰 추정: 영문/숫자 단어는 약 4자당 1토큰, CJK 문자와 기호는 각 1토큰
+TOKEN_PIECE = re.compile(r'[A-Za-z0-9]+|[぀-ヿ㐀-鿿가-힯]|[^\sA-Za-z0-9]')
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(raw):
+    """HTML 태그/엔티티 제거 후 공백 정리"""
+    if not raw:
+        return ""
+    if '<' in raw:
+        parser = _TextExtractor()
+        parser.feed(raw)
+        parser.close()
+        text = ''.join(parser.parts)
+    else:
+        text = unescape(raw)
+    text = text.replace('\r\n', '\n').replace('\xa0', ' ')
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r' *\n *', '\n', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def strip_boilerplate(text):
+    """RSS 꼬리말("The post … appeared first on …" 등) 제거"""
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub(' ', text)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def is_text_payload(text):
+    """번역할 텍스트인지 판별 (영상 임베드 마커 등은 제외)"""
+    if not text or text.lstrip().startswith(NON_TEXT_MARKERS):
+        return False
+    return bool(re.search(r'[A-Za-z0-9가-힣]', text))
+
+
+def estimate_tokens(text):
+    """로컬 토큰 수 추정 (SDK 호출 없이)"""
+    total = 0
+    for piece in TOKEN_PIECE.findall(text or ""):
+        total += -(-len(piece) // 4) if piece[0].isascii() and piece[0].isalnum() else 1
+    return total
+
+
+def truncate_to_tokens(text, max_tokens=DEFAULT_SUMMARY_TOKEN_BUDGET):
+    """토큰 예산 안에서 문장 경계로 절단. 첫 문장부터 넘치면 단어 경계로 자르고 … 추가"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens < 1:
+        # 예산 0 이하: 음수 슬라이스로 원문 대부분이 남지 않도록 빈 문자열
+        return ''
+
+    kept, used = [], 0
+    for sentence in SENTENCE_END.split(text):
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return ' '.join(kept)
+
+    words, used = [], 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost > max_tokens - 1:
+            break
+        words.append(word)
+        used += cost
+    if not words:
+        # 공백 없는 긴 토막(URL 등)은 추정 비율(4자/토큰)로 강제 절단
+        return text[:(max_tokens - 1) * 4] + '…'
+    return ' '.join(words).rstrip(',;:') + '…'
+
+
+def prepare_for_translation(raw, max_tokens=DEFAULT_SUMMARY_TOKEN_BUDGET):
+    """번역 입력 정규화 파이프라인. 번역할 내용이 없으면 빈 문자열"""
+    if not is_text_payload(raw):
+        return ""
+    text = strip_boilerplate(html_to_text(raw))
+    if not is_text_payload(text):
+        return ""
+    return truncate_to_tokens(text, max_tokens)
+
+
+def normalize_title(raw):
+    """제목: 태그/엔티티 제거 후 한 줄로"""
+    return re.sub(r'\s+', ' ', html_to_text(raw)).strip()
@@ -1,6 +1,5 @@
 import os
 import sys
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,6 +8,9 @@ load_dotenv()
 # Service: Google Gemini API for Translation
 
 def get_gemini_model():
+    # Gemini SDK는 번역 단계에서만 import (CLI 콜드 스타트 단축)
+    import google.generativeai as genai
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print("Error: GEMINI_API_KEY not found.", file=sys.stderr)
@@ -97,6 +97,115 @@ create table public.crawl_logs (
 create index idx_crawl_logs_run
   on public.crawl_logs (run_id);
 
+-- 보존 정책: N일 지난 런의 아이템별 로그를 (run, source)당 롤업 1행으로 압축
+-- (summary/rollup 행은 유지, 에러 메시지는 최대 5건 보존)
+create or replace function public.compact_crawl_logs(p_older_than_days int default 30)
+returns int as $$
+declare removed int;
+begin
+  with old as (
+    select l.* from public.crawl_logs l
+      join public.crawl_runs r on r.id = l.run_id
+     where r.started_at < now() - make_interval(days => p_older_than_days)
+       and not (coalesce(l.meta, '{}'::jsonb) ? 'summary')
+       and not (coalesce(l.meta, '{}'::jsonb) ? 'rollup')
+  ), rolled as (
+    insert into public.crawl_logs (run_id, source_id, level, message, meta)
+    select run_id, source_id,
+           case when count(*) filter (where level = 'error') > 0 then 'error'
+                when count(*) filter (where level = 'warn') > 0 then 'warn'
+                else 'info' end,
+           format('Rollup: %s info, %s warn, %s error',
+                  count(*) filter (where level = 'info'),
+                  count(*) filter (where level = 'warn'),
+                  count(*) filter (where level = 'error')),
+           jsonb_build_object(
+             'rollup', true,
+             'counts', jsonb_build_object(
+               'info',  count(*) filter (where level = 'info'),
+               'warn',  count(*) filter (where level = 'warn'),
+               'error', count(*) filter (where level = 'error')),
+             'errors', to_jsonb((array_agg(message order by created_at)
+                                 filter (where level = 'error'))[1:5]))
+      from old
+     group by run_id, source_id
+    returning 1
+  ), deleted as (
+    delete from public.crawl_logs d using old where d.id = old.id
+    returning 1
+  )
+  select count(*) into removed from deleted;
+  return removed;
+end;
+$$ language plpgsql;
+
+-- ── F) crawl_leases (multi-worker) ──────────────────────────
+create table public.crawl_leases (
+  run_id            uuid not null references public.crawl_runs(id) on delete cascade,
+  source_key        text not null,
+  status            text not null default 'pending'
+                    check (status in ('pending','leased','done','failed')),
+  worker_id         text,
+  lease_expires_at  timestamptz,
+  heartbeat_at      timestamptz,
+  attempts          int not null default 0,
+  items_found       int not null default 0,
+  items_created     int not null default 0,
+  items_updated     int not null default 0,
+  items_skipped     int not null default 0,
+  affected_days     text[] not null default '{}',
+  error_message     text,
+  primary key (run_id, source_key)
+);
+
+create index idx_crawl_leases_claim
+  on public.crawl_leases (run_id, status, lease_expires_at);
+
+-- 대기 중이거나 만료된 리스 1건을 원자적으로 획득
+create or replace function public.claim_crawl_lease(
+  p_run_id uuid, p_worker_id text, p_ttl_seconds int, p_max_attempts int default 3
+)
+returns setof public.crawl_leases as $$
+begin
+  update public.crawl_leases
+     set status = 'failed',
+         error_message = coalesce(error_message, 'lease expired too many times')
+   where run_id = p_run_id and status = 'leased'
+     and lease_expires_at < now() and attempts >= p_max_attempts;
+
+  return query
+  update public.crawl_leases l
+     set status = 'leased',
+         worker_id = p_worker_id,
+         attempts = l.attempts + 1,
+         lease_expires_at = now() + make_interval(secs => p_ttl_seconds),
+         heartbeat_at = now()
+   where (l.run_id, l.source_key) = (
+     select c.run_id, c.source_key from public.crawl_leases c
+      where c.run_id = p_run_id
+        and (c.status = 'pending' or (c.status = 'leased' and c.lease_expires_at < now()))
+      order by c.attempts, c.source_key
+      limit 1
+      for update skip locked)
+  returning l.*;
+end;
+$$ language plpgsql;
+
+-- ── G) digest_snapshots (viewer read model) ─────────────────
+-- key: 'day:YYYY-MM-DD' (전체) / 'day:YYYY-MM-DD:source:<uuid>' (소스별)
+-- payload: 아이템 + 한국어 번역 (published_at desc 정렬 완료)
+create table public.digest_snapshots (
+  key         text primary key,
+  day         date not null,
+  source_id   uuid references public.sources(id) on delete cascade,
+  item_count  int not null default 0,
+  payload     jsonb not null default '[]'::jsonb,
+  updated_at  timestamptz not null default now()
+);
+
+create index idx_digest_snapshots_day
+  on public.digest_snapshots (day desc);
+
 -- ── Trigger: updated_at ─────────────────────────────────────
 create or replace function public.set_updated_at()
 returns trigger as $$
@@ -107,18 +216,76 @@ create trigger trg_items_updated
   before update on public.items
   for each row execute function public.set_updated_at();
 
+-- ── Trigger: digest_snapshots invalidation ──────────────────
+-- items / item_translations가 바뀌면 그 발행일(KST)의 스냅샷을 삭제
+-- → 뷰어는 라이브 쿼리로 fallback, 다음 materialize_digests()가 재생성
+--   (web crawlDaily, --no-digest / --no-translate 런, 수동 수정 모두 포함)
+create or replace function public.digest_day(p_published_at timestamptz)
+returns date as $$
+  -- execution/digest.py digest_day()와 같은 규칙 (발행일 없으면 현재 시각)
+  select (coalesce(p_published_at, now()) at time zone 'Asia/Seoul')::date;
+$$ language sql stable;
+
+create or replace function public.invalidate_item_digests()
+returns trigger as $$
+begin
+  if tg_op = 'UPDATE'
+     and (old.published_at, old.title, old.summary, old.author, old.canonical_url, old.source_id, old.raw)
+         is not distinct from
+         (new.published_at, new.title, new.summary, new.author, new.canonical_url, new.source_id, new.raw) then
+    return null;
+  end if;
+  if tg_op in ('UPDATE', 'DELETE') then
+    delete from public.digest_snapshots where day = public.digest_day(old.published_at);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    delete from public.digest_snapshots where day = public.digest_day(new.published_at);
+  end if;
+  return null;
+end;
+$$ language plpgsql;
+
+create trigger trg_items_invalidate_digests
+  after insert or update or delete on public.items
+  for each row execute function public.invalidate_item_digests();
+
+create or replace function public.invalidate_translation_digests()
+returns trigger as $$
+declare
+  v_item_id uuid;
+begin
+  if tg_op = 'DELETE' then
+    v_item_id := old.item_id;
+  else
+    v_item_id := new.item_id;
+  end if;
+  delete from public.digest_snapshots s
+   using public.items i
+   where i.id = v_item_id
+     and s.day = public.digest_day(i.published_at);
+  return null;
+end;
+$$ language plpgsql;
+
+create trigger trg_item_translations_invalidate_digests
+  after insert or update or delete on public.item_translations
+  for each row execute function public.invalidate_translation_digests();
+
 -- ── RLS ─────────────────────────────────────────────────────
 alter table public.sources           enable row level security;
 alter table public.items             enable row level security;
 alter table public.item_translations enable row level security;
 alter table public.crawl_runs        enable row level security;
 alter table public.crawl_logs        enable row level security;
+alter table public.crawl_leases      enable row level security;
+alter table public.digest_snapshots  enable row level security;
 
 do $$
 declare t text;
 begin
   for t in select unnest(array[
-    'sources','items','item_translations','crawl_runs','crawl_logs'
+    'sources','items','item_translations','crawl_runs','crawl_logs',
+    'crawl_leases','digest_snapshots'
   ]) loop
     execute format(
       'create policy "anon_read_%1$s" on public.%1$s for select using (true)', t);
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# execution/ 스크립트는 패키지가 아니므로 모듈 경로에 직접 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'execution'))
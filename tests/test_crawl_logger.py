@@ -0,0 +1,72 @@
+import pytest
+
+from crawl_logger import CrawlLogger, is_sampled
+
+
+def make_logger(rate=0.0, **kwargs):
+    rows = []
+    logger = CrawlLogger('run', source_id='src', success_sample_rate=rate,
+                         flush_interval_s=60, sink=rows.extend, **kwargs)
+    return logger, rows
+
+
+def test_is_sampled_is_deterministic():
+    urls = [f'https://example.com/{i}' for i in range(200)]
+    first = [is_sampled(url, 0.3) for url in urls]
+    assert first == [is_sampled(url, 0.3) for url in urls]
+    assert 0 < sum(first) < len(urls)
+
+
+def test_is_sampled_rate_bounds():
+    assert is_sampled('https://example.com/a', 1) is True
+    assert is_sampled('https://example.com/a', 0) is False
+    assert is_sampled(None, 1) is True
+
+
+@pytest.mark.parametrize('statuses, level', [
+    ([], 'info'),
+    (['success'], 'info'),
+    (['success', 'skipped'], 'warn'),
+    (['success', 'error'], 'warn'),
+    (['error', 'error'], 'error'),
+])
+def test_summary_row_level(statuses, level):
+    logger, _ = make_logger()
+    for i, status in enumerate(statuses):
+        logger.log(f'https://example.com/{i}', status)
+    logger.close()
+    assert logger.summary_row()['level'] == level
+
+
+def test_unsampled_success_is_counted_but_not_written():
+    logger, rows = make_logger(rate=0.0)
+    logger.log('https://example.com/a', 'success')
+    logger.log('https://example.com/b', 'skipped')
+    logger.close()
+    assert [r['level'] for r in rows] == ['warn', 'warn']
+    summary = rows[-1]
+    assert summary['meta']['summary'] is True
+    assert summary['meta']['counts'] == {'success': 1, 'skipped': 1}
+    assert summary['meta']['sampled_success'] == 0
+
+
+def test_close_flushes_buffer_and_summary_once():
+    logger, rows = make_logger(rate=1.0)
+    logger.log('https://example.com/a', 'success', item_id='i1')
+    logger.close()
+    logger.close()
+    assert len(rows) == 2
+    assert rows[0]['meta'] == {'url': 'https://example.com/a', 'item_id': 'i1'}
+    assert rows[1]['meta']['summary'] is True
+
+
+def test_exit_records_escaping_exception():
+    rows = []
+    with pytest.raises(RuntimeError):
+        with CrawlLogger('run', success_sample_rate=0, flush_interval_s=60, sink=rows.extend) as logger:
+            logger.log('https://example.com/a', 'success')
+            raise RuntimeError('parse failed')
+    assert rows[0]['level'] == 'error'
+    assert 'parse failed' in rows[0]['message']
+    assert rows[-1]['meta']['counts'] == {'success': 1, 'error': 1}
+    assert rows[-1]['level'] == 'warn'
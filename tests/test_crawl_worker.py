@@ -0,0 +1,57 @@
+import crawl_worker
+from crawl_worker import MAX_STORE_ERRORS, run_worker
+from lease import SqliteLeaseStore
+
+SOURCES = [({'slug': 'a', 'name': 'A'}, 3), ({'slug': 'b', 'name': 'B'}, 3)]
+
+
+class BrokenClaimStore(SqliteLeaseStore):
+    """claim RPC만 실패하고 summary 조회는 되는 저장소"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.claims = 0
+
+    def claim(self, run_id, worker_id, ttl_s):
+        self.claims += 1
+        return False
+
+
+def test_claim_errors_stop_the_worker(tmp_path, monkeypatch):
+    finalized = []
+    monkeypatch.setattr(crawl_worker, 'finalize_run', lambda *args: finalized.append(args))
+    store = BrokenClaimStore(str(tmp_path / 'leases.db'))
+    assert run_worker(store, 'run', 'w1', sources=SOURCES, poll_interval_s=0) is None
+    assert store.claims == MAX_STORE_ERRORS
+    assert finalized == []
+    assert store.summary('run')['pending'] == 2
+
+
+def crawl_ok(config, max_items, run_id):
+    return {'status': 'completed', 'items_found': 1, 'items_created': 1,
+            'items_updated': 0, 'items_skipped': 0, 'days': ['2026-10-19']}
+
+
+def patch_finish(monkeypatch, results):
+    """finish_crawl_run이 results를 차례로 반환하도록 교체. 반환: 다이제스트 재생성 호출 기록"""
+    results = iter(results)
+    materialized = []
+    monkeypatch.setattr(crawl_worker, 'finish_crawl_run', lambda *args, **kwargs: next(results))
+    monkeypatch.setattr(crawl_worker, 'materialize_digests', materialized.append)
+    return materialized
+
+
+def test_only_the_worker_that_finishes_the_run_materializes(tmp_path, monkeypatch):
+    materialized = patch_finish(monkeypatch, [True, False])
+    store = SqliteLeaseStore(str(tmp_path / 'leases.db'))
+    first = run_worker(store, 'run', 'w1', sources=SOURCES, poll_interval_s=0, crawl_fn=crawl_ok)
+    second = run_worker(store, 'run', 'w2', sources=SOURCES, poll_interval_s=0, crawl_fn=crawl_ok)
+    assert first['done'] == 2 and second['done'] == 2
+    assert materialized == [['2026-10-19']]
+
+
+def test_failed_finish_leaves_run_open(tmp_path, monkeypatch):
+    materialized = patch_finish(monkeypatch, [None])
+    store = SqliteLeaseStore(str(tmp_path / 'leases.db'))
+    assert run_worker(store, 'run', 'w1', sources=SOURCES, poll_interval_s=0, crawl_fn=crawl_ok) is None
+    assert materialized == []
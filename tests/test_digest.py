@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import digest
+from digest import JsonDigestWriter, build_day_snapshots, day_key, digest_day, write_digest_snapshots
+
+
+@pytest.mark.parametrize('published_at, day', [
+    ('Sun, 18 Oct 2026 16:30:00 GMT', '2026-10-19'),       # RFC 822, UTC 16:30 → KST 다음 날
+    ('Sun, 18 Oct 2026 14:59:00 +0000', '2026-10-18'),
+    ('2026-10-18T15:00:00Z', '2026-10-19'),
+    ('2026-10-18T23:00:00+09:00', '2026-10-18'),
+    ('2026-10-18T20:00:00', '2026-10-19'),                 # naive → UTC로 간주
+    ('2026-10-18', '2026-10-18'),
+])
+def test_digest_day_uses_kst(published_at, day):
+    assert digest_day(published_at) == day
+
+
+def row(item_id, source_id, published_at, translations=()):
+    return {'id': item_id, 'title': f'title {item_id}', 'source_id': source_id,
+            'published_at': published_at, 'item_translations': list(translations)}
+
+
+def test_build_day_snapshots_sorts_and_splits_by_source():
+    rows = [
+        row('old', 's1', '2026-10-19T01:00:00+09:00'),
+        row('new', 's2', '2026-10-19T09:00:00+09:00'),
+        row('undated', 's1', None),
+        row('mid', 's1', '2026-10-19T05:00:00+09:00'),
+    ]
+    snapshots = {s['key']: s for s in build_day_snapshots('2026-10-19', rows)}
+    assert set(snapshots) == {day_key('2026-10-19'), day_key('2026-10-19', 's1'), day_key('2026-10-19', 's2')}
+
+    day = snapshots['day:2026-10-19']
+    assert day['source_id'] is None
+    assert [e['id'] for e in day['payload']] == ['new', 'mid', 'old', 'undated']
+    assert day['item_count'] == 4
+
+    s1 = snapshots['day:2026-10-19:source:s1']
+    assert [e['id'] for e in s1['payload']] == ['mid', 'old', 'undated']
+    assert s1['item_count'] == 3
+
+
+def test_build_day_snapshots_keeps_korean_translation_only():
+    rows = [row('a', 's1', '2026-10-19T01:00:00+09:00', [
+        {'lang': 'ja', 'title_translated': 'ja title', 'summary_translated': None},
+        {'lang': 'ko', 'title_translated': '한국어 제목', 'summary_translated': '요약'},
+    ])]
+    entry = build_day_snapshots('2026-10-19', rows)[0]['payload'][0]
+    assert entry['item_translations'] == [{'title_translated': '한국어 제목', 'summary_translated': '요약'}]
+    assert entry['raw'] == {}
+
+
+def test_json_digest_writer_writes_day_and_source_files(tmp_path):
+    snapshots = build_day_snapshots('2026-10-19', [row('a', 's1', '2026-10-19T01:00:00+09:00')])
+    assert JsonDigestWriter(str(tmp_path))(snapshots) is True
+
+    day = json.loads((tmp_path / '2026-10-19.json').read_text(encoding='utf-8'))
+    source = json.loads((tmp_path / '2026-10-19' / 's1.json').read_text(encoding='utf-8'))
+    assert day['key'] == 'day:2026-10-19'
+    assert source['payload'][0]['id'] == 'a'
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+def test_json_digest_writer_removes_sources_no_longer_produced(tmp_path):
+    writer = JsonDigestWriter(str(tmp_path))
+    writer(build_day_snapshots('2026-10-19', [row('a', 's1', '2026-10-19T01:00:00+09:00'),
+                                              row('b', 's2', '2026-10-19T02:00:00+09:00')]))
+    writer(build_day_snapshots('2026-10-19', [row('b', 's2', '2026-10-19T02:00:00+09:00')]))
+    assert sorted(p.name for p in (tmp_path / '2026-10-19').iterdir()) == ['s2.json']
+
+
+def test_write_digest_snapshots_prunes_other_keys_of_the_day(monkeypatch):
+    calls = []
+    monkeypatch.setattr(digest, 'upsert_digest_snapshots', lambda rows: calls.append(('upsert', len(rows))) or True)
+    monkeypatch.setattr(digest, 'delete_stale_digest_snapshots',
+                        lambda day, keys: calls.append(('delete', day, sorted(keys))) or True)
+    snapshots = build_day_snapshots('2026-10-19', [row('a', 's1', '2026-10-19T01:00:00+09:00')])
+    assert write_digest_snapshots(snapshots) is True
+    assert calls == [('upsert', 2), ('delete', '2026-10-19', ['day:2026-10-19', 'day:2026-10-19:source:s1'])]
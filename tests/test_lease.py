@@ -0,0 +1,71 @@
+import pytest
+
+from lease import SqliteLeaseStore, rollup_leases
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SqliteLeaseStore(str(tmp_path / 'leases.db'), max_attempts=2)
+    s.seed('run', ['a', 'b'])
+    return s
+
+
+def test_seed_is_idempotent(store):
+    store.seed('run', ['a', 'b'])
+    assert store.summary('run')['total_sources'] == 2
+
+
+def test_claim_hands_out_each_source_once(store):
+    assert store.claim('run', 'w1', 60) == 'a'
+    assert store.claim('run', 'w2', 60) == 'b'
+    assert store.claim('run', 'w3', 60) is None
+    assert store.summary('run')['leased'] == 2
+
+
+def test_expired_lease_is_reassigned(store):
+    store.claim('run', 'dead', -1)  # 즉시 만료
+    store.claim('run', 'w1', 60)
+    assert store.claim('run', 'w2', 60) == 'a'
+
+
+def test_stale_complete_returns_false(store):
+    store.claim('run', 'dead', -1)
+    store.claim('run', 'w1', 60)
+    store.claim('run', 'w2', 60)
+    assert store.complete('run', 'a', 'dead', 'done') is False
+    assert store.complete('run', 'a', 'w2', 'done') is True
+
+
+def test_max_attempts_marks_failed(store):
+    assert store.claim('run', 'dead1', -1) == 'a'  # 1회차 만료
+    assert store.claim('run', 'w1', 60) == 'b'
+    assert store.claim('run', 'dead2', -1) == 'a'  # 2회차 만료
+    assert store.claim('run', 'w3', 60) is None    # max_attempts 도달 → failed
+    summary = store.summary('run')
+    assert summary['failed'] == 1
+    assert summary['leased'] == 1
+
+
+def test_heartbeat_keeps_lease(store):
+    store.claim('run', 'w1', -1)
+    assert store.heartbeat('run', 'w1', 60) == 1
+    assert store.claim('run', 'w2', 60) == 'b'
+    assert store.claim('run', 'w3', 60) is None
+
+
+def test_summary_rolls_up_stats_and_days(store):
+    store.claim('run', 'w1', 60)
+    store.claim('run', 'w1', 60)
+    stats = {'items_found': 3, 'items_created': 1, 'items_updated': 1, 'items_skipped': 1}
+    store.complete('run', 'a', 'w1', 'done', stats={**stats, 'days': ['2026-10-19']})
+    store.complete('run', 'b', 'w1', 'failed', stats={**stats, 'days': ['2026-10-18', '2026-10-19']})
+    summary = store.summary('run')
+    assert summary['done'] == 1 and summary['failed'] == 1
+    assert summary['items_found'] == 6
+    assert summary['days'] == ['2026-10-18', '2026-10-19']
+
+
+def test_rollup_empty():
+    summary = rollup_leases([])
+    assert summary['total_sources'] == 0
+    assert summary['pending'] + summary['leased'] == 0
@@ -0,0 +1,48 @@
+from text_cleaner import estimate_tokens, prepare_for_translation, truncate_to_tokens
+
+
+def test_strips_html_and_post_footer():
+    raw = ('<p>Hello &amp; welcome to Acme. This is a test.</p>'
+           '<p>The post <a href="x">Acme launches</a> appeared first on venturebeat.com.</p>')
+    assert prepare_for_translation(raw) == 'Hello & welcome to Acme. This is a test.'
+
+
+def test_keeps_read_more_phrases_inside_text():
+    text = 'I will keep reading books all day. The company grew fast.'
+    assert prepare_for_translation(text) == text
+
+
+def test_strips_trailing_continue_reading():
+    assert prepare_for_translation('<p>Funding news.</p><p>Continue reading on Sifted</p>') == 'Funding news.'
+    assert prepare_for_translation('Funding news. Continue reading →') == 'Funding news.'
+
+
+def test_skips_video_embed_marker():
+    assert prepare_for_translation('[VIDEO_EMBED]https://www.youtube.com/embed/abc') == ''
+
+
+def test_truncates_at_sentence_boundary():
+    text = ' '.join(f'Sentence number {i} has a few words.' for i in range(50))
+    out = truncate_to_tokens(text, 40)
+    assert out.endswith('words.')
+    assert estimate_tokens(out) <= 40
+
+
+def test_keeps_leading_keep_reading_sentence():
+    text = 'Keep reading to learn how Acme raised $5M. It plans to hire.'
+    assert prepare_for_translation(text) == text
+
+
+def test_non_positive_budget_returns_empty():
+    text = 'x' * 100
+    assert truncate_to_tokens(text, 0) == ''
+    assert truncate_to_tokens(text, -5) == ''
+    assert truncate_to_tokens('', 0) == ''
+
+
+def test_strips_hn_meta_lines_only():
+    raw = ('<p>Article URL: https://example.com/a</p><p>Comments URL: https://news.ycombinator.com/item?id=1</p>'
+           '<p>Points: 12</p><p># Comments: 3</p>')
+    assert prepare_for_translation(raw) == ''
+    text = 'Points: 12 players scored in the final. # Comments: 3 were removed.'
+    assert prepare_for_translation(text) == text
@@ -2,6 +2,8 @@ import { createServerClient } from "@/lib/supabase";
 import Link from "next/link";
 import { buildViewData } from "@/lib/item-view";
 import { normalizeTitle } from "@/lib/text";
+import { digestDayRange, getDigestSnapshot, isDigestDay } from "@/lib/digest";
+import type { DigestEntry } from "@/lib/types";
 
 interface Props {
   searchParams: Promise<{
@@ -9,6 +11,7 @@ interface Props {
     period?: string;
     q?: string;
     t?: string;
+    day?: string;
     page?: string;
   }>;
 }
@@ -25,43 +28,68 @@ export default async function HomePage({ searchParams }: Props) {
 
   const translationFilter = params.t ?? "all";
 
-  // Build query (items + source + translation)
-  let query = supabase
-    .from("items")
-    .select(
-      `id, title, summary, author, published_at, canonical_url, source_id, raw,
-       sources!inner(name, type),
-       item_translations(title_translated, summary_translated)`,
-      { count: "exact" }
-    )
-    .order("published_at", { ascending: false, nullsFirst: false })
-    .range(offset, offset + PAGE_SIZE - 1);
+  const day = isDigestDay(params.day) ? params.day : undefined;
 
-  if (params.source) {
-    query = query.eq("source_id", params.source);
-  }
-  if (params.period) {
-    const cutoff = new Date();
-    if (params.period === "24h") cutoff.setHours(cutoff.getHours() - 24);
-    else if (params.period === "7d") cutoff.setDate(cutoff.getDate() - 7);
-    else if (params.period === "30d") cutoff.setDate(cutoff.getDate() - 30);
-    query = query.gte("published_at", cutoff.toISOString());
-  }
-  if (params.q) {
-    query = query.or(`title.ilike.%${params.q}%,summary.ilike.%${params.q}%`);
-  }
-  if (translationFilter === "translated") {
-    query = query.or(
-      "title_translated.not.is.null,summary_translated.not.is.null",
-      { foreignTable: "item_translations" }
-    );
-  }
-  if (translationFilter === "pending") {
-    query = query.is("item_translations.title_translated", null);
-    query = query.is("item_translations.summary_translated", null);
+  // Day view: one digest_snapshots lookup (built by execution/digest.py after each run).
+  // A trigger on items / item_translations deletes a day's snapshots whenever that day changes
+  // (including crawlDaily runs), so a snapshot that exists is current. Search / translation /
+  // period filters, or a missing snapshot, fall back to the live query.
+  const snapshot =
+    day && !params.q && !params.period && translationFilter === "all"
+      ? await getDigestSnapshot(day, params.source)
+      : null;
+
+  let items: DigestEntry[] = [];
+  let count: number | null = 0;
+  if (snapshot) {
+    items = snapshot.payload.slice(offset, offset + PAGE_SIZE);
+    count = snapshot.item_count;
+  } else {
+    // Build query (items + source + translation)
+    let query = supabase
+      .from("items")
+      .select(
+        `id, title, summary, author, published_at, canonical_url, source_id, raw,
+         sources!inner(name, type),
+         item_translations(title_translated, summary_translated)`,
+        { count: "exact" }
+      )
+      .order("published_at", { ascending: false, nullsFirst: false })
+      .range(offset, offset + PAGE_SIZE - 1);
+
+    if (params.source) {
+      query = query.eq("source_id", params.source);
+    }
+    if (params.period) {
+      const cutoff = new Date();
+      if (params.period === "24h") cutoff.setHours(cutoff.getHours() - 24);
+      else if (params.period === "7d") cutoff.setDate(cutoff.getDate() - 7);
+      else if (params.period === "30d") cutoff.setDate(cutoff.getDate() - 30);
+      query = query.gte("published_at", cutoff.toISOString());
+    }
+    if (params.q) {
+      query = query.or(`title.ilike.%${params.q}%,summary.ilike.%${params.q}%`);
+    }
+    if (translationFilter === "translated") {
+      query = query.or(
+        "title_translated.not.is.null,summary_translated.not.is.null",
+        { foreignTable: "item_translations" }
+      );
+    }
+    if (translationFilter === "pending") {
+      query = query.is("item_translations.title_translated", null);
+      query = query.is("item_translations.summary_translated", null);
+    }
+    if (day) {
+      const [dayStart, dayEnd] = digestDayRange(day);
+      query = query.gte("published_at", dayStart).lt("published_at", dayEnd);
+    }
+
+    const { data, count: liveCount } = await query;
+    items = (data ?? []) as unknown as DigestEntry[];
+    count = liveCount;
   }
 
-  const { data: items, count } = await query;
   const totalPages = Math.ceil((count ?? 0) / PAGE_SIZE);
 
   // Sources for filter
@@ -146,6 +174,13 @@ export default async function HomePage({ searchParams }: Props) {
           ))}
         </div>
 
+        <input
+          type="date"
+          name="day"
+          defaultValue={day ?? ""}
+          className="rounded border px-3 py-1.5 text-sm"
+        />
+
         <input
           type="text"
           name="q"
@@ -275,6 +310,7 @@ function buildUrl(p: Record<string, string | undefined>, page: number): string {
   if (p.period) sp.set("period", p.period);
   if (p.q) sp.set("q", p.q);
   if (p.t) sp.set("t", p.t);
+  if (p.day) sp.set("day", p.day);
   sp.set("page", String(page));
   return `/?${sp.toString()}`;
 }
@@ -288,6 +324,7 @@ function buildPeriodUrl(
   if (p.source) sp.set("source", p.source);
   if (p.q) sp.set("q", p.q);
   if (translationFilter !== "all") sp.set("t", translationFilter);
+  if (p.day) sp.set("day", p.day);
   if (period !== "all") sp.set("period", period);
   return `/?${sp.toString()}`;
 }
@@ -0,0 +1,32 @@
+import { createServerClient } from '@/lib/supabase'
+import type { DigestSnapshot } from '@/lib/types'
+
+// Digest days are KST calendar days — must match execution/digest.py DIGEST_TZ
+const DIGEST_TZ_OFFSET = '+09:00'
+const DAY_MS = 24 * 60 * 60 * 1000
+
+export function isDigestDay(value: string | undefined): value is string {
+  return Boolean(value && /^\d{4}-\d{2}-\d{2}$/.test(value) && !Number.isNaN(Date.parse(value)))
+}
+
+// [start, end) of a digest day as ISO timestamps, for the live-query fallback
+export function digestDayRange(day: string): [string, string] {
+  const start = new Date(`${day}T00:00:00${DIGEST_TZ_OFFSET}`)
+  return [start.toISOString(), new Date(start.getTime() + DAY_MS).toISOString()]
+}
+
+// Snapshot keys — must match execution/digest.py day_key()
+export function digestKey(day: string, sourceId?: string): string {
+  return sourceId ? `day:${day}:source:${sourceId}` : `day:${day}`
+}
+
+// Single key lookup instead of items ⨝ item_translations + sort
+export async function getDigestSnapshot(day: string, sourceId?: string): Promise<DigestSnapshot | null> {
+  const supabase = createServerClient()
+  const { data } = await supabase
+    .from('digest_snapshots')
+    .select('key, day, source_id, item_count, payload, updated_at')
+    .eq('key', digestKey(day, sourceId))
+    .maybeSingle()
+  return (data as DigestSnapshot | null) ?? null
+}
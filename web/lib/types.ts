@@ -71,6 +71,25 @@ export interface ItemWithTranslation extends Item {
   item_translations: Pick<ItemTranslation, 'title_translated' | 'summary_translated'>[]
 }
 
+// ── Digest Snapshots ────────────────────────────────────────
+
+// One entry of a digest snapshot — mirrors execution/digest.py build_entry()
+export interface DigestEntry
+  extends Pick<Item, 'id' | 'title' | 'summary' | 'author' | 'published_at' | 'canonical_url' | 'source_id' | 'raw'> {
+  sources: Pick<Source, 'name' | 'type'> | null
+  item_translations: Pick<ItemTranslation, 'title_translated' | 'summary_translated'>[]
+}
+
+// Precomputed by execution/digest.py after each crawl run (already sorted by published_at desc)
+export interface DigestSnapshot {
+  key: string
+  day: string
+  source_id: string | null
+  item_count: number
+  payload: DigestEntry[]
+  updated_at: string
+}
+
 // ── crawl_policy ────────────────────────────────────────────
 
 export interface CrawlPolicy {